@@ -1,17 +1,51 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
-import datetime
+import time
 import base64
-from typing import Dict, List, Optional
+from collections import deque
+from functools import lru_cache
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
 from cryptography.hazmat.backends import default_backend
 from cryptography.exceptions import InvalidSignature
 import abc
 
+try:
+    import orjson as json
+except ImportError:  # orjson is optional; stdlib json has the same loads/dumps surface
+    import json
+
+# Signed headers are valid well beyond this window, so identical requests inside it share one signature
+SIGNATURE_CACHE_BUCKET_MS = 250
+SIGNATURE_CACHE_SIZE = 64
+
+# Maximum number of order IDs accepted by a single batch cancel request
+BATCH_CANCEL_LIMIT = 20
+
+def _ok(response: requests.Response) -> bool:
+    """Cheap success check used instead of raise_for_status on the hot path."""
+    return response.status_code < 400
+
+_METHOD_BYTES = {'GET': b'GET', 'POST': b'POST', 'DELETE': b'DELETE'}
+
+@lru_cache(maxsize=128)
+def _signing_path(path: str) -> Tuple[str, bytes]:
+    """Strip query parameters from a request path and pre-encode it for signing."""
+    path_without_query = path.split('?')[0]
+    return path_without_query, path_without_query.encode('utf-8')
+
+class Quote(NamedTuple):
+    """Mid-market prices in dollars for each side of a market."""
+    yes: float
+    no: float
+
 class AbstractTradingAPI(abc.ABC):
     @abc.abstractmethod
-    def get_price(self) -> float:
+    def get_price(self) -> Quote:
         pass
 
     @abc.abstractmethod
@@ -22,6 +56,13 @@ class AbstractTradingAPI(abc.ABC):
     def cancel_order(self, order_id: str) -> bool:
         pass
 
+    def cancel_orders(self, order_ids: List[str]) -> Optional[List[Optional[bool]]]:
+        """
+        Cancel several orders in one call. Returns per-order results, with None for
+        orders that were not processed, or None if batch cancellation is unsupported.
+        """
+        return None
+
     @abc.abstractmethod
     def get_position(self) -> int:
         pass
@@ -33,7 +74,7 @@ class AbstractTradingAPI(abc.ABC):
 class KalshiTradingAPI(AbstractTradingAPI):
     """
     API client for Kalshi trading operations using API key authentication.
-    Handles RSA-PSS signed requests, account management, and order execution.
+    Handles RSA-PSS (or Ed25519) signed requests, account management, and order execution.
     
     Follows Kalshi's official documentation:
     https://docs.kalshi.com/getting_started/api_keys
@@ -53,7 +94,13 @@ class KalshiTradingAPI(AbstractTradingAPI):
         self.market_ticker = market_ticker
         self.base_url = base_url.rstrip('/')  # Remove trailing slash if present
         self.private_key = None
+        # Signed headers reused within a short window: (method, path, ts_bucket) -> headers
+        self._sig_cache: Dict[Tuple[str, str, int], Dict[str, str]] = {}
+        self._sig_cache_keys: Deque[Tuple[str, str, int]] = deque()
+        # Cleared once the batch cancel endpoint is rejected (it requires advanced API access)
+        self._batch_cancel_supported = True
         self.logger = self._setup_logger()
+        self.session = self._setup_session()
         
         # Load private key
         self._load_private_key()
@@ -73,6 +120,20 @@ class KalshiTradingAPI(AbstractTradingAPI):
         
         return logger
     
+    def _setup_session(self) -> requests.Session:
+        """Set up a persistent HTTP session so connections are kept alive between calls."""
+        session = requests.Session()
+        # Only retry idempotent methods on connection errors; never resend a POST order
+        retry = Retry(total=3, backoff_factor=0.1, allowed_methods=frozenset(['GET', 'DELETE']))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=8, max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            'Accept': 'application/json',
+            'User-Agent': 'kmm/1.0'
+        })
+        return session
+    
     def _load_private_key(self):
         """Load private key from PEM file - follows Kalshi documentation."""
         try:
@@ -82,35 +143,41 @@ class KalshiTradingAPI(AbstractTradingAPI):
                     password=None,
                     backend=default_backend()
                 )
+            self._pss_padding = padding.PSS(
+                mgf=padding.MGF1(hashes.SHA256()),
+                salt_length=padding.PSS.DIGEST_LENGTH
+            )
+            self._hash = hashes.SHA256()
             self.logger.info("Private key loaded successfully")
+            # Signing runs in OpenSSL, which uses the key's CRT parameters and the CPU's SHA extensions
+            self.logger.info(f"Signing backend: {default_backend().openssl_version_text()}")
         except Exception as e:
             self.logger.error(f"Failed to load private key: {e}")
             raise
     
-    def _sign_pss_text(self, text: str) -> str:
+    def _sign_pss_text(self, message: bytes) -> str:
         """
-        Sign text with private key using RSA-PSS.
+        Sign message with private key using RSA-PSS.
         Follows Kalshi's sign_pss_text function exactly.
+        Ed25519 keys are signed directly, since they hash internally.
         
         Args:
-            text: Text to sign (timestamp + method + path)
+            message: UTF-8 bytes to sign (timestamp + method + path)
         
         Returns:
             Base64-encoded signature
         """
-        message = text.encode('utf-8')
-        try:
-            signature = self.private_key.sign(
-                message,
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.DIGEST_LENGTH
-                ),
-                hashes.SHA256()
-            )
-            return base64.b64encode(signature).decode('utf-8')
-        except InvalidSignature as e:
-            raise ValueError("RSA sign PSS failed") from e
+        if isinstance(self.private_key, Ed25519PrivateKey):
+            try:
+                signature = self.private_key.sign(message)
+            except InvalidSignature as e:
+                raise ValueError("Ed25519 sign failed") from e
+        else:
+            try:
+                signature = self.private_key.sign(message, self._pss_padding, self._hash)
+            except InvalidSignature as e:
+                raise ValueError("RSA sign PSS failed") from e
+        return base64.b64encode(signature).decode('utf-8')
     
     def _get_signed_headers(self, method: str, path: str) -> Dict[str, str]:
         """
@@ -125,26 +192,43 @@ class KalshiTradingAPI(AbstractTradingAPI):
             Dict of headers including signature
         """
         # Get current timestamp in milliseconds
-        current_time = datetime.datetime.now()
-        timestamp = current_time.timestamp()
-        current_time_milliseconds = int(timestamp * 1000)
-        timestamp_str = str(current_time_milliseconds)
+        current_time_milliseconds = time.time_ns() // 1_000_000
         
         # Strip query parameters from path before signing
-        path_without_query = path.split('?')[0]
+        path_without_query, path_bytes = _signing_path(path)
         
-        # Create message string: timestamp + method + path
-        msg_string = timestamp_str + method + path_without_query
+        # Reuse a signature made for the same request within the last bucket
+        cache_key = (method, path_without_query, current_time_milliseconds // SIGNATURE_CACHE_BUCKET_MS)
+        cached = self._sig_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+        
+        timestamp_str = str(current_time_milliseconds)
+        
+        # Create message: timestamp + method + path
+        method_bytes = _METHOD_BYTES.get(method) or method.encode('utf-8')
+        message = b''.join((timestamp_str.encode('ascii'), method_bytes, path_bytes))
         
         # Sign the message
-        sig = self._sign_pss_text(msg_string)
+        sig = self._sign_pss_text(message)
         
         # Return headers as per Kalshi documentation
-        return {
+        headers = {
             'KALSHI-ACCESS-KEY': self.api_key_id,
             'KALSHI-ACCESS-SIGNATURE': sig,
             'KALSHI-ACCESS-TIMESTAMP': timestamp_str
         }
+        
+        self._sig_cache[cache_key] = headers
+        self._sig_cache_keys.append(cache_key)
+        if len(self._sig_cache_keys) > SIGNATURE_CACHE_SIZE:
+            self._sig_cache.pop(self._sig_cache_keys.popleft(), None)
+        
+        return dict(headers)
+    
+    def _json(self, response: requests.Response):
+        """Parse a response body straight from bytes, skipping requests' text decoding."""
+        return json.loads(response.content)
     
     def get_balance(self) -> Dict:
         """
@@ -158,9 +242,11 @@ class KalshiTradingAPI(AbstractTradingAPI):
         
         try:
             headers = self._get_signed_headers('GET', path)
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            balance_data = response.json()
+            response = self.session.get(url, headers=headers)
+            if not _ok(response):
+                self.logger.error(f"Failed to get balance: HTTP {response.status_code} {response.text}")
+                return None
+            balance_data = self._json(response)
             
             balance = balance_data.get('balance', 0) # in cents
             
@@ -189,9 +275,11 @@ class KalshiTradingAPI(AbstractTradingAPI):
         
         try:
             headers = self._get_signed_headers('GET', path)
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+            response = self.session.get(url, headers=headers)
+            if not _ok(response):
+                self.logger.error(f"Failed to get positions: HTTP {response.status_code} {response.text}")
+                return []
+            data = self._json(response)
             
             positions = data.get('market_positions', [])
             total_position = 0
@@ -199,8 +287,8 @@ class KalshiTradingAPI(AbstractTradingAPI):
                 if position["ticker"] == self.market_ticker:
                     total_position += position["position"]
 
-            self.logger.info(f"Found {len(positions)} open positions")
-            self.logger.info(f"Current position: {total_position}")
+            self.logger.info("Found %d open positions", len(positions))
+            self.logger.info("Current position: %s", total_position)
             
             return total_position
             
@@ -208,7 +296,7 @@ class KalshiTradingAPI(AbstractTradingAPI):
             self.logger.error(f"Failed to get positions: {e}")
             return []
     
-    def get_price(self) -> Dict[str, float]:
+    def get_price(self) -> Quote:
         """
         Get orderbook for a specific market.
         """
@@ -217,24 +305,23 @@ class KalshiTradingAPI(AbstractTradingAPI):
         
         try:
             headers = self._get_signed_headers('GET', path)
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+            response = self.session.get(url, headers=headers)
+            if not _ok(response):
+                self.logger.error(f"Failed to get orderbook for {self.market_ticker}: HTTP {response.status_code} {response.text}")
+                return None
+            data = self._json(response)
 
-            yes_bid = float(data["market"]["yes_bid"]) / 100
-            yes_ask = float(data["market"]["yes_ask"]) / 100
-            no_bid = float(data["market"]["no_bid"]) / 100
-            no_ask = float(data["market"]["no_ask"]) / 100
-            
-            yes_mid_price = round((yes_bid + yes_ask) / 2, 2)
-            no_mid_price = round((no_bid + no_ask) / 2, 2)
+            # Quotes are integer cents; round half-cent mids up in cents, then convert to dollars
+            market = data["market"]
+            yes_mid_price = ((market["yes_bid"] + market["yes_ask"] + 1) // 2) / 100
+            no_mid_price = ((market["no_bid"] + market["no_ask"] + 1) // 2) / 100
 
-            self.logger.info(f"Current yes mid-market price: ${yes_mid_price:.2f}")
-            self.logger.info(f"Current no mid-market price: ${no_mid_price:.2f}")
-            return {"yes": yes_mid_price, "no": no_mid_price}
+            self.logger.info("Current yes mid-market price: $%.2f", yes_mid_price)
+            self.logger.info("Current no mid-market price: $%.2f", no_mid_price)
+            return Quote(yes_mid_price, no_mid_price)
             
         except Exception as e:
-            self.logger.error(f"Failed to get orderbook for {ticker}: {e}")
+            self.logger.error(f"Failed to get orderbook for {self.market_ticker}: {e}")
             return None
         
     def place_order(self, 
@@ -278,12 +365,15 @@ class KalshiTradingAPI(AbstractTradingAPI):
             payload['expiration_ts'] = expiration_ts
         
         try:
-            self.logger.info(f"Placing order: {side.upper()} {count} contracts @ {price}¢ on {self.market_ticker}")
+            self.logger.info("Placing order: %s %s contracts @ %s¢ on %s", side.upper(), count, price, self.market_ticker)
             
             headers = self._get_signed_headers('POST', path)
-            response = requests.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-            order_id = response.json()["order"]["order_id"]
+            headers['Content-Type'] = 'application/json'
+            response = self.session.post(url, data=json.dumps(payload), headers=headers)
+            if not _ok(response):
+                self.logger.error(f"Failed to place order: HTTP {response.status_code} {response.text}")
+                return None
+            order_id = self._json(response)["order"]["order_id"]
             
             return str(order_id)
             
@@ -306,28 +396,88 @@ class KalshiTradingAPI(AbstractTradingAPI):
         
         try:
             headers = self._get_signed_headers('DELETE', path)
-            response = requests.delete(url, headers=headers)
-            response.raise_for_status()
+            response = self.session.delete(url, headers=headers)
+            if not _ok(response):
+                self.logger.error(f"Failed to cancel order {order_id}: HTTP {response.status_code} {response.text}")
+                return False
             
-            self.logger.info(f"Order {order_id} cancelled successfully")
+            self.logger.info("Order %s cancelled successfully", order_id)
             return True
             
         except Exception as e:
             self.logger.error(f"Failed to cancel order {order_id}: {e}")
             return False
         
-    def get_orders(self) -> List[Dict]:
-        path = '/trade-api/v2/portfolio/orders'
+    def cancel_orders(self, order_ids: List[str]) -> Optional[List[Optional[bool]]]:
+        """
+        Cancel several orders using Kalshi's batch cancel endpoint.
+        
+        Args:
+            order_ids: Order IDs to cancel
+        
+        Returns:
+            Per-order success flags, with None for orders whose batch was not
+            processed, or None if the batch endpoint is unavailable
+        """
+        if not self._batch_cancel_supported:
+            return None
+        
+        path = '/trade-api/v2/portfolio/orders/batched'
+        url = self.base_url + path
+        
+        results: Dict[str, bool] = {}
+        for i in range(0, len(order_ids), BATCH_CANCEL_LIMIT):
+            batch = order_ids[i:i + BATCH_CANCEL_LIMIT]
+            try:
+                headers = self._get_signed_headers('DELETE', path)
+                headers['Content-Type'] = 'application/json'
+                response = self.session.delete(url, data=json.dumps({'ids': batch}), headers=headers)
+                if not _ok(response):
+                    if response.status_code in (403, 404):
+                        self._batch_cancel_supported = False
+                        self.logger.warning(f"Batch cancel unavailable (HTTP {response.status_code}), cancelling orders individually")
+                    else:
+                        self.logger.error(f"Failed to batch cancel orders: HTTP {response.status_code} {response.text}")
+                    break
+                data = self._json(response)
+            except Exception as e:
+                self.logger.error(f"Failed to batch cancel orders: {e}")
+                break
+            
+            # Orders in a processed batch are settled even if the response omits them
+            for order_id in batch:
+                results[order_id] = False
+            for result in data.get('orders', []):
+                if result.get('order_id') in results and not result.get('error'):
+                    results[result['order_id']] = True
+        
+        self.logger.info("Batch cancelled %d of %d orders", sum(results.values()), len(order_ids))
+        return [results.get(order_id) for order_id in order_ids]
+        
+    def get_orders(self, status: str = 'resting') -> List[Dict]:
+        """
+        Get this market's orders, filtered server-side.
+        
+        Args:
+            status: Order status to return (default: resting)
+        
+        Returns:
+            List of order dictionaries
+        """
+        # Query parameters are stripped before signing
+        path = f'/trade-api/v2/portfolio/orders?ticker={self.market_ticker}&status={status}'
         url = self.base_url + path
         
         try:
             headers = self._get_signed_headers('GET', path)
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+            response = self.session.get(url, headers=headers)
+            if not _ok(response):
+                self.logger.error(f"Failed to get orders: HTTP {response.status_code} {response.text}")
+                return []
+            data = self._json(response)
             
             orders = data.get('orders', [])
-            self.logger.info(f"Found {len(orders)} open orders")
+            self.logger.info("Found %d open orders", len(orders))
             return orders
             
         except Exception as e:
@@ -1,11 +1,84 @@
 import abc
 import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import Dict, List, Tuple
 import requests
 import logging
 import uuid
 import math
-from kalshi_api import AbstractTradingAPI
+from kalshi_api import AbstractTradingAPI, Quote
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to plain Python
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
+# Avellaneda-Stoikov math kept as module-level scalar functions so numba can compile them
+@njit('float64(float64, int64, int64)', cache=True, fastmath=True)
+def _dynamic_gamma(base_gamma, inventory, max_position):
+    position_ratio = inventory / max_position
+    return base_gamma * math.exp(-abs(position_ratio))
+
+@njit('float64(float64, int64, float64, float64, float64, float64, int64, float64)', cache=True, fastmath=True)
+def _reservation_price(mid_price, inventory, t, base_gamma, sigma, T, max_position, inventory_skew_factor):
+    dynamic_gamma = _dynamic_gamma(base_gamma, inventory, max_position)
+    inventory_skew = inventory * inventory_skew_factor * mid_price
+    return mid_price + inventory_skew - inventory * dynamic_gamma * (sigma**2) * (1 - t/T)
+
+@njit('float64(float64, int64, float64, float64, float64, float64, int64, float64)', cache=True, fastmath=True)
+def _optimal_spread(t, inventory, base_gamma, k, sigma, T, max_position, min_spread):
+    dynamic_gamma = _dynamic_gamma(base_gamma, inventory, max_position)
+    base_spread = (dynamic_gamma * (sigma**2) * (1 - t/T) +
+                   (2 / dynamic_gamma) * math.log(1 + (dynamic_gamma / k)))
+    position_ratio = abs(inventory) / max_position
+    spread_adjustment = 1 - (position_ratio ** 2)
+    return max(base_spread * spread_adjustment * 0.01, min_spread)
+
+@njit('UniTuple(float64, 3)(float64, int64, float64, float64, float64, float64, float64, int64, float64, float64)', cache=True, fastmath=True)
+def _calc_quotes(mid_price, inventory, t, base_gamma, k, sigma, T, max_position, min_spread, inventory_skew_factor):
+    """Return (reservation_price, bid_price, ask_price)."""
+    reservation_price = _reservation_price(mid_price, inventory, t, base_gamma, sigma, T, max_position, inventory_skew_factor)
+    base_spread = _optimal_spread(t, inventory, base_gamma, k, sigma, T, max_position, min_spread)
+
+    position_ratio = inventory / max_position
+    spread_adjustment = base_spread * abs(position_ratio) * 3
+
+    if inventory > 0:
+        bid_spread = base_spread / 2 + spread_adjustment
+        ask_spread = max(base_spread / 2 - spread_adjustment, min_spread / 2)
+    else:
+        bid_spread = max(base_spread / 2 - spread_adjustment, min_spread / 2)
+        ask_spread = base_spread / 2 + spread_adjustment
+
+    bid_price = max(0.0, min(mid_price, reservation_price - bid_spread))
+    ask_price = min(1.0, max(mid_price, reservation_price + ask_spread))
+
+    return reservation_price, bid_price, ask_price
+
+@njit('UniTuple(int64, 2)(int64, int64, float64)', cache=True, fastmath=True)
+def _order_sizes(inventory, max_position, position_limit_buffer):
+    remaining_capacity = max_position - abs(inventory)
+    buffer_size = int(max_position * position_limit_buffer)
+
+    if inventory > 0:
+        buy_size = max(1, min(buffer_size, remaining_capacity))
+        sell_size = max(1, max_position)
+    else:
+        buy_size = max(1, max_position)
+        sell_size = max(1, min(buffer_size, remaining_capacity))
+
+    return buy_size, sell_size
+
+@dataclass
+class TickSnapshot:
+    mid_prices: Quote
+    inventory: int
+    orders: List[Dict]
 
 class AvellanedaMarketMaker:
     def __init__(
@@ -35,121 +108,121 @@ class AvellanedaMarketMaker:
         self.position_limit_buffer = position_limit_buffer
         self.inventory_skew_factor = inventory_skew_factor
         self.trade_side = trade_side
+        self._executor = ThreadPoolExecutor(max_workers=4)
+        # Separate pool so cancel fan-out never waits on workers held by the tasks that issue it
+        self._cancel_executor = ThreadPoolExecutor(max_workers=4)
 
     def run(self, dt: float):
-        start_time = time.time()
-        while time.time() - start_time < self.T:
-            current_time = time.time() - start_time
-            self.logger.info(f"Running Avellaneda market maker at {current_time:.2f}")
-
-            mid_prices = self.api.get_price()
-            mid_price = mid_prices[self.trade_side]
-            inventory = self.api.get_position()
-            self.logger.info(f"Current mid price for {self.trade_side}: {mid_price:.4f}, Inventory: {inventory}")
-
-            reservation_price = self.calculate_reservation_price(mid_price, inventory, current_time)
-            bid_price, ask_price = self.calculate_asymmetric_quotes(mid_price, inventory, current_time)
+        # Monotonic clock avoids NTP jumps; a fixed deadline keeps the tick period at dt regardless of work time
+        start_time = time.monotonic()
+        deadline = start_time
+        while time.monotonic() - start_time < self.T:
+            current_time = time.monotonic() - start_time
+            self.logger.info("Running Avellaneda market maker at %.2f", current_time)
+
+            snapshot = self._tick_snapshot()
+            mid_price = getattr(snapshot.mid_prices, self.trade_side)
+            inventory = snapshot.inventory
+            self.logger.info("Current mid price for %s: %.4f, Inventory: %s", self.trade_side, mid_price, inventory)
+
+            reservation_price, bid_price, ask_price = self.calculate_quotes(mid_price, inventory, current_time)
             buy_size, sell_size = self.calculate_order_sizes(inventory)
 
-            self.logger.info(f"Reservation price: {reservation_price:.4f}")
-            self.logger.info(f"Computed desired bid: {bid_price:.4f}, ask: {ask_price:.4f}")
+            self.logger.info("Reservation price: %.4f", reservation_price)
+            self.logger.info("Computed desired bid: %.4f, ask: %.4f", bid_price, ask_price)
 
-            self.manage_orders(bid_price, ask_price, buy_size, sell_size)
+            self.manage_orders(snapshot, bid_price, ask_price, buy_size, sell_size)
 
-            time.sleep(dt)
+            # Skip missed ticks after an overrun rather than firing them back to back
+            deadline = max(deadline + dt, time.monotonic())
+            time.sleep(max(0, deadline - time.monotonic()))
 
         self.logger.info("Avellaneda market maker finished running")
 
+    def _tick_snapshot(self) -> TickSnapshot:
+        # Independent reads, so issue them concurrently over the shared session
+        price_future = self._executor.submit(self.api.get_price)
+        position_future = self._executor.submit(self.api.get_position)
+        orders_future = self._executor.submit(self.api.get_orders)
+        return TickSnapshot(price_future.result(), position_future.result(), orders_future.result())
+
+    def _cancel_orders(self, order_ids: List[str]) -> List[bool]:
+        if not order_ids:
+            return []
+        cancelled = self.api.cancel_orders(order_ids)
+        if cancelled is None:
+            cancelled = [None] * len(order_ids)
+        # Fan individual cancels out over the pool for any orders the batch did not reach
+        remaining = [i for i, result in enumerate(cancelled) if result is None]
+        if remaining:
+            fallback = self._cancel_executor.map(self.api.cancel_order, [order_ids[i] for i in remaining])
+            for i, result in zip(remaining, fallback):
+                cancelled[i] = result
+        return cancelled
+
+    def calculate_quotes(self, mid_price: float, inventory: int, t: float) -> Tuple[float, float, float]:
+        return _calc_quotes(float(mid_price), int(inventory), float(t), float(self.base_gamma), float(self.k),
+                            float(self.sigma), float(self.T), int(self.max_position), float(self.min_spread),
+                            float(self.inventory_skew_factor))
+
     def calculate_asymmetric_quotes(self, mid_price: float, inventory: int, t: float) -> Tuple[float, float]:
-        reservation_price = self.calculate_reservation_price(mid_price, inventory, t)
-        base_spread = self.calculate_optimal_spread(t, inventory)
-        
-        position_ratio = inventory / self.max_position
-        spread_adjustment = base_spread * abs(position_ratio) * 3
-        
-        if inventory > 0:
-            bid_spread = base_spread / 2 + spread_adjustment
-            ask_spread = max(base_spread / 2 - spread_adjustment, self.min_spread / 2)
-        else:
-            bid_spread = max(base_spread / 2 - spread_adjustment, self.min_spread / 2)
-            ask_spread = base_spread / 2 + spread_adjustment
-        
-        bid_price = max(0, min(mid_price, reservation_price - bid_spread))
-        ask_price = min(1, max(mid_price, reservation_price + ask_spread))
-        
+        _, bid_price, ask_price = self.calculate_quotes(mid_price, inventory, t)
         return bid_price, ask_price
 
     def calculate_reservation_price(self, mid_price: float, inventory: int, t: float) -> float:
-        dynamic_gamma = self.calculate_dynamic_gamma(inventory)
-        inventory_skew = inventory * self.inventory_skew_factor * mid_price
-        return mid_price + inventory_skew - inventory * dynamic_gamma * (self.sigma**2) * (1 - t/self.T)
+        return _reservation_price(float(mid_price), int(inventory), float(t), float(self.base_gamma), float(self.sigma),
+                                  float(self.T), int(self.max_position), float(self.inventory_skew_factor))
 
     def calculate_optimal_spread(self, t: float, inventory: int) -> float:
-        dynamic_gamma = self.calculate_dynamic_gamma(inventory)
-        base_spread = (dynamic_gamma * (self.sigma**2) * (1 - t/self.T) + 
-                       (2 / dynamic_gamma) * math.log(1 + (dynamic_gamma / self.k)))
-        position_ratio = abs(inventory) / self.max_position
-        spread_adjustment = 1 - (position_ratio ** 2)
-        return max(base_spread * spread_adjustment * 0.01, self.min_spread)
+        return _optimal_spread(float(t), int(inventory), float(self.base_gamma), float(self.k), float(self.sigma),
+                               float(self.T), int(self.max_position), float(self.min_spread))
 
     def calculate_dynamic_gamma(self, inventory: int) -> float:
-        position_ratio = inventory / self.max_position
-        return self.base_gamma * math.exp(-abs(position_ratio))
+        return _dynamic_gamma(float(self.base_gamma), int(inventory), int(self.max_position))
 
     def calculate_order_sizes(self, inventory: int) -> Tuple[int, int]:
-        remaining_capacity = self.max_position - abs(inventory)
-        buffer_size = int(self.max_position * self.position_limit_buffer)
-        
-        if inventory > 0:
-            buy_size = max(1, min(buffer_size, remaining_capacity))
-            sell_size = max(1, self.max_position)
-        else:
-            buy_size = max(1, self.max_position)
-            sell_size = max(1, min(buffer_size, remaining_capacity))
-        
-        return buy_size, sell_size
-
-    def manage_orders(self, bid_price: float, ask_price: float, buy_size: int, sell_size: int):
-        current_orders = self.api.get_orders()
-        self.logger.info(f"Retrieved {len(current_orders)} total orders")
-
-        buy_orders = []
-        sell_orders = []
+        return _order_sizes(int(inventory), int(self.max_position), float(self.position_limit_buffer))
+
+    def manage_orders(self, snapshot: TickSnapshot, bid_price: float, ask_price: float, buy_size: int, sell_size: int):
+        # Reuse the tick's snapshot rather than re-querying prices or orders
+        current_orders = snapshot.orders
+        mid_price = getattr(snapshot.mid_prices, self.trade_side)
+        self.logger.info("Retrieved %d total orders", len(current_orders))
 
+        orders_by_action = defaultdict(list)
         for order in current_orders:
             if order['side'] == self.trade_side:
-                if order['action'] == 'buy':
-                    buy_orders.append(order)
-                elif order['action'] == 'sell':
-                    sell_orders.append(order)
+                orders_by_action[order['action']].append(order)
+        buy_orders, sell_orders = orders_by_action['buy'], orders_by_action['sell']
 
-        self.logger.info(f"Current buy orders: {len(buy_orders)}")
-        self.logger.info(f"Current sell orders: {len(sell_orders)}")
+        self.logger.info("Current buy orders: %d", len(buy_orders))
+        self.logger.info("Current sell orders: %d", len(sell_orders))
 
-        # Handle buy orders
-        self.handle_order_side('buy', buy_orders, bid_price, buy_size)
+        # Buy and sell sides are independent, so overlap the sell side with the buy side run inline
+        sell_future = self._executor.submit(self.handle_order_side, 'sell', sell_orders, ask_price, sell_size, mid_price)
+        self.handle_order_side('buy', buy_orders, bid_price, buy_size, mid_price)
+        sell_future.result()
 
-        # Handle sell orders
-        self.handle_order_side('sell', sell_orders, ask_price, sell_size)
-
-    def handle_order_side(self, action: str, orders: List[Dict], desired_price: float, desired_size: int):
+    def handle_order_side(self, action: str, orders: List[Dict], desired_price: float, desired_size: int, current_price: float):
         keep_order = None
+        ids_to_cancel = []
         for order in orders:
-            current_price = float(order['yes_price']) / 100 if self.trade_side == 'yes' else float(order['no_price']) / 100
-            if keep_order is None and abs(current_price - desired_price) < 0.01 and order['remaining_count'] == desired_size:
+            order_price = float(order['yes_price']) / 100 if self.trade_side == 'yes' else float(order['no_price']) / 100
+            if keep_order is None and abs(order_price - desired_price) < 0.01 and order['remaining_count'] == desired_size:
                 keep_order = order
-                self.logger.info(f"Keeping existing {action} order. ID: {order['order_id']}, Price: {current_price:.4f}")
+                self.logger.info("Keeping existing %s order. ID: %s, Price: %.4f", action, order['order_id'], order_price)
             else:
-                self.logger.info(f"Cancelling extraneous {action} order. ID: {order['order_id']}, Price: {current_price:.4f}")
-                self.api.cancel_order(order['order_id'])
+                self.logger.info("Cancelling extraneous %s order. ID: %s, Price: %.4f", action, order['order_id'], order_price)
+                ids_to_cancel.append(order['order_id'])
+
+        self._cancel_orders(ids_to_cancel)
 
-        current_price = self.api.get_price()[self.trade_side]
         if keep_order is None:
             if (action == 'buy' and desired_price < current_price) or (action == 'sell' and desired_price > current_price):
                 try:
                     order_id = self.api.place_order(action, self.trade_side, desired_price, desired_size, int(time.time()) + self.order_expiration)
-                    self.logger.info(f"Placed new {action} order. ID: {order_id}, Price: {desired_price:.4f}, Size: {desired_size}")
+                    self.logger.info("Placed new %s order. ID: %s, Price: %.4f, Size: %s", action, order_id, desired_price, desired_size)
                 except Exception as e:
                     self.logger.error(f"Failed to place {action} order: {str(e)}")
             else:
-                self.logger.info(f"Skipped placing {action} order. Desired price {desired_price:.4f} does not improve on current price {current_price:.4f}")
\ No newline at end of file
+                self.logger.info("Skipped placing %s order. Desired price %.4f does not improve on current price %.4f", action, desired_price, current_price)
\ No newline at end of file